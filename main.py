@@ -1,7 +1,12 @@
 import streamlit as st
 import difflib
-import re
-from typing import List
+import html
+from collections import Counter
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+# Cached diff results hold the compared texts, so keep them only briefly
+_CACHE_TTL = 300  # seconds
 
 
 def strip_leading_whitespace(lines: List[str]) -> List[str]:
@@ -14,80 +19,317 @@ def strip_leading_whitespace(lines: List[str]) -> List[str]:
     Returns:
         List of lines with leading whitespace removed
     """
-    return [line.lstrip(' \t') + '\n' if line.endswith('\n') else line.lstrip(' \t') 
-            for line in lines]
+    # Per-line lstrip rather than one regex pass over the text: removing a
+    # whitespace-only line can merge or drop the line breaks around it
+    return [line.lstrip(' \t') for line in lines]
+
+
+def _lines_stripped(text: str) -> List[str]:
+    """Split text into lines with leading whitespace removed."""
+    return strip_leading_whitespace(text.splitlines())
+
+
+Opcode = Tuple[str, int, int, int, int]
+
+# Replace blocks smaller than this get character-level highlighting
+_INTRALINE_MAX_LINES = 5
+
+# Line pairs less similar than this are highlighted as whole lines, as in
+# difflib's _fancy_replace
+_INTRALINE_CUTOFF = 0.75
+
+# Character-level matching costs up to len(old) * len(new) per line pair; once
+# a render has spent this many cells, the remaining pairs are highlighted as
+# whole lines instead
+_INTRALINE_BUDGET = 10_000_000
+
+# Line matching walks every indexed occurrence of each line; past this many
+# steps the inputs get a coarse diff instead (roughly one second of matching)
+_LINE_MATCH_BUDGET = 1_000_000
+
+
+def _intern(lines: List[str], table: Dict[str, int]) -> List[int]:
+    """Map each line to a small integer id shared through table."""
+    return [table.setdefault(line, len(table)) for line in lines]
+
+
+def _line_match_cost(ids1: List[int], ids2: List[int]) -> int:
+    """Estimate the work of one longest-match search over the full inputs."""
+    counts = Counter(ids2)
+    if len(ids2) >= 200:
+        # SequenceMatcher's autojunk drops lines this popular from its index
+        popular = len(ids2) // 100 + 1
+        counts = Counter({line: count for line, count in counts.items() if count <= popular})
+    return sum(counts[line] for line in ids1)
+
+
+def _coarse_opcodes(ids1: List[int], ids2: List[int]) -> List[Opcode]:
+    """Treat the common prefix and suffix as equal and everything between as one change."""
+    shortest = min(len(ids1), len(ids2))
+    prefix = 0
+    while prefix < shortest and ids1[prefix] == ids2[prefix]:
+        prefix += 1
+    suffix = 0
+    while suffix < shortest - prefix and ids1[-1 - suffix] == ids2[-1 - suffix]:
+        suffix += 1
+    
+    i2 = len(ids1) - suffix
+    j2 = len(ids2) - suffix
+    opcodes = []
+    if prefix:
+        opcodes.append(('equal', 0, prefix, 0, prefix))
+    if prefix < i2 and prefix < j2:
+        opcodes.append(('replace', prefix, i2, prefix, j2))
+    elif prefix < i2:
+        opcodes.append(('delete', prefix, i2, prefix, j2))
+    elif prefix < j2:
+        opcodes.append(('insert', prefix, i2, prefix, j2))
+    if suffix:
+        opcodes.append(('equal', i2, len(ids1), j2, len(ids2)))
+    return opcodes
+
+
+@st.cache_data(max_entries=32, ttl=_CACHE_TTL)
+def is_coarse_match(lines1: List[str], lines2: List[str]) -> bool:
+    """
+    Check whether compute_opcodes() falls back to a coarse diff for these lines.
+    
+    Args:
+        lines1: Lines of the first text
+        lines2: Lines of the second text
+        
+    Returns:
+        True if the inputs exceed the line matching budget
+    """
+    table: Dict[str, int] = {}
+    return _line_match_cost(_intern(lines1, table), _intern(lines2, table)) > _LINE_MATCH_BUDGET
 
 
-def generate_diff(text1: str, text2: str, ignore_leading_whitespace: bool = False) -> str:
+@st.cache_data(max_entries=32, ttl=_CACHE_TTL)
+def compute_opcodes(lines1: List[str], lines2: List[str]) -> List[Opcode]:
     """
-    Generate a unified diff between two texts.
+    Match two lists of lines once and return the edit opcodes.
     
     Args:
-        text1: First text input
-        text2: Second text input
-        ignore_leading_whitespace: If True, strip leading whitespace before comparing
+        lines1: Lines of the first text
+        lines2: Lines of the second text
+        
+    Returns:
+        List of (tag, i1, i2, j1, j2) opcodes as returned by SequenceMatcher
+    """
+    # Match integer ids rather than strings: each line is hashed once here
+    # instead of repeatedly inside the matcher. Opcode indices map 1:1 back
+    # to the original lines.
+    table: Dict[str, int] = {}
+    ids1 = _intern(lines1, table)
+    ids2 = _intern(lines2, table)
+    
+    # Matching is still O(N*M) on inputs where many lines repeat just below
+    # the autojunk threshold; keep the worker responsive on those
+    if _line_match_cost(ids1, ids2) > _LINE_MATCH_BUDGET:
+        return _coarse_opcodes(ids1, ids2)
+    
+    # Keep autojunk: without it, blank lines and closing braces that repeat
+    # hundreds of times make every longest-match search quadratic
+    return difflib.SequenceMatcher(None, ids1, ids2).get_opcodes()
+
+
+def group_opcodes(opcodes: List[Opcode], n: int = 3) -> Iterator[List[Opcode]]:
+    """
+    Split opcodes into change clusters with up to n lines of context.
+    
+    Mirrors SequenceMatcher.get_grouped_opcodes() so precomputed opcodes
+    can be reused without running the matcher again.
+    
+    Args:
+        opcodes: Opcodes as returned by compute_opcodes()
+        n: Number of context lines around each change
+        
+    Returns:
+        Iterator of opcode groups
+    """
+    codes = list(opcodes) or [('equal', 0, 1, 0, 1)]
+    
+    # Trim leading and trailing context
+    if codes[0][0] == 'equal':
+        tag, i1, i2, j1, j2 = codes[0]
+        codes[0] = tag, max(i1, i2 - n), i2, max(j1, j2 - n), j2
+    if codes[-1][0] == 'equal':
+        tag, i1, i2, j1, j2 = codes[-1]
+        codes[-1] = tag, i1, min(i2, i1 + n), j1, min(j2, j1 + n)
+    
+    group = []
+    for tag, i1, i2, j1, j2 in codes:
+        # Start a new group whenever a long unchanged range separates changes
+        if tag == 'equal' and i2 - i1 > 2 * n:
+            group.append((tag, i1, min(i2, i1 + n), j1, min(j2, j1 + n)))
+            yield group
+            group = []
+            i1, j1 = max(i1, i2 - n), max(j1, j2 - n)
+        group.append((tag, i1, i2, j1, j2))
+    
+    if group and not (len(group) == 1 and group[0][0] == 'equal'):
+        yield group
+
+
+def _format_range_unified(start: int, stop: int) -> str:
+    """Format a line range for a unified diff hunk header."""
+    beginning = start + 1
+    length = stop - start
+    if length == 1:
+        return f'{beginning}'
+    if not length:
+        beginning -= 1
+    return f'{beginning},{length}'
+
+
+@st.cache_data(max_entries=32, ttl=_CACHE_TTL)
+def generate_diff(lines1: List[str], lines2: List[str]) -> str:
+    """
+    Generate a unified diff between two lists of lines.
+    
+    Args:
+        lines1: Lines of the first text, already prepared for comparison
+        lines2: Lines of the second text, already prepared for comparison
         
     Returns:
         Unified diff string
     """
-    lines1 = text1.splitlines(keepends=True)
-    lines2 = text2.splitlines(keepends=True)
-    
-    if ignore_leading_whitespace:
-        lines1 = strip_leading_whitespace(lines1)
-        lines2 = strip_leading_whitespace(lines2)
-    
-    diff = difflib.unified_diff(
-        lines1,
-        lines2,
-        fromfile='Text 1',
-        tofile='Text 2',
-        lineterm='',
-        n=3
-    )
+    # Same output as difflib.unified_diff, but built from the shared opcodes
+    # so the lines are not matched again (and without autojunk)
+    diff = []
+    for group in group_opcodes(compute_opcodes(lines1, lines2), n=3):
+        if not diff:
+            diff.append('--- Text 1')
+            diff.append('+++ Text 2')
+        
+        first, last = group[0], group[-1]
+        file1_range = _format_range_unified(first[1], last[2])
+        file2_range = _format_range_unified(first[3], last[4])
+        diff.append(f'@@ -{file1_range} +{file2_range} @@')
+        
+        for tag, i1, i2, j1, j2 in group:
+            if tag == 'equal':
+                diff.extend(' ' + line for line in lines1[i1:i2])
+                continue
+            if tag in ('replace', 'delete'):
+                diff.extend('-' + line for line in lines1[i1:i2])
+            if tag in ('replace', 'insert'):
+                diff.extend('+' + line for line in lines2[j1:j2])
     
     return '\n'.join(diff)
 
 
-def generate_html_diff(text1: str, text2: str, ignore_leading_whitespace: bool = False) -> str:
+def _intraline_markup(old: str, new: str) -> Optional[Tuple[str, str]]:
+    """
+    Escape a pair of changed lines, highlighting the characters that differ.
+    
+    Args:
+        old: Line from the first text
+        new: Line from the second text
+        
+    Returns:
+        Tuple of (old, new) HTML fragments, or None if the lines are too
+        dissimilar for character-level highlighting to be useful
+    """
+    # Default autojunk keeps long lines of repeated characters cheap, and the
+    # upper-bound ratios reject dissimilar pairs before any matching is done
+    matcher = difflib.SequenceMatcher(None, old, new)
+    if matcher.real_quick_ratio() < _INTRALINE_CUTOFF or matcher.quick_ratio() < _INTRALINE_CUTOFF:
+        return None
+    
+    old_parts = []
+    new_parts = []
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        old_chunk = html.escape(old[i1:i2])
+        new_chunk = html.escape(new[j1:j2])
+        if tag == 'equal':
+            old_parts.append(old_chunk)
+            new_parts.append(new_chunk)
+            continue
+        if old_chunk:
+            old_parts.append(f'<span class="diff_chg">{old_chunk}</span>')
+        if new_chunk:
+            new_parts.append(f'<span class="diff_chg">{new_chunk}</span>')
+    return ''.join(old_parts), ''.join(new_parts)
+
+
+def _diff_row(tag: str, num1: str, cell1: str, num2: str, cell2: str, css1: str = '', css2: str = '') -> str:
+    """Build one side-by-side table row."""
+    return (
+        f'<tr class="diff_{tag}">'
+        f'<td class="diff_header">{num1}</td><td class="{css1}">{cell1}</td>'
+        f'<td class="diff_header">{num2}</td><td class="{css2}">{cell2}</td>'
+        '</tr>'
+    )
+
+
+@st.cache_data(max_entries=32, ttl=_CACHE_TTL)
+def generate_html_diff(lines1: List[str], lines2: List[str]) -> str:
     """
     Generate an HTML formatted diff with color coding.
     
     Args:
-        text1: First text input
-        text2: Second text input
-        ignore_leading_whitespace: If True, strip leading whitespace before comparing
+        lines1: Lines of the first text, already prepared for comparison
+        lines2: Lines of the second text, already prepared for comparison
         
     Returns:
         HTML formatted diff string
     """
-    lines1 = text1.splitlines()
-    lines2 = text2.splitlines()
-    
-    if ignore_leading_whitespace:
-        lines1 = [line.lstrip(' \t') for line in lines1]
-        lines2 = [line.lstrip(' \t') for line in lines2]
-    
-    diff = difflib.HtmlDiff(wrapcolumn=80, tabsize=4)
-    html_diff = diff.make_file(
-        lines1,
-        lines2,
-        fromdesc='Text 1',
-        todesc='Text 2',
-        context=True,
-        numlines=3
-    )
+    # Escape each distinct line once; the memo is local, so escaped user
+    # text is dropped when the render returns
+    escaped: Dict[str, str] = {}
     
-    # Extract the table and styles from the complete HTML document
-    # difflib.HtmlDiff.make_file() returns a complete HTML document
+    def _esc(line: str) -> str:
+        if line not in escaped:
+            escaped[line] = html.escape(line)
+        return escaped[line]
     
-    # Extract style block
-    style_match = re.search(r'<style[^>]*>(.*?)</style>', html_diff, re.DOTALL)
-    styles = style_match.group(0) if style_match else ''
+    # Emit rows straight from the opcodes into a list joined once at the end
+    rows = []
+    intraline_cells = 0
+    for index, group in enumerate(group_opcodes(compute_opcodes(lines1, lines2), n=3)):
+        if index:
+            rows.append('<tr class="diff_sep"><td colspan="4">&#8943;</td></tr>')
+        for tag, i1, i2, j1, j2 in group:
+            if tag == 'equal':
+                for i, j in zip(range(i1, i2), range(j1, j2)):
+                    line = _esc(lines1[i])
+                    rows.append(_diff_row(tag, str(i + 1), line, str(j + 1), line))
+                continue
+            
+            intraline = tag == 'replace' and max(i2 - i1, j2 - j1) < _INTRALINE_MAX_LINES
+            for k in range(max(i2 - i1, j2 - j1)):
+                i = i1 + k
+                j = j1 + k
+                old = lines1[i] if i < i2 else None
+                new = lines2[j] if j < j2 else None
+                markup = None
+                if intraline and old is not None and new is not None:
+                    cells = len(old) * len(new)
+                    if intraline_cells + cells <= _INTRALINE_BUDGET:
+                        intraline_cells += cells
+                        markup = _intraline_markup(old, new)
+                if markup:
+                    cell1, cell2 = markup
+                else:
+                    cell1 = _esc(old) if old is not None else ''
+                    cell2 = _esc(new) if new is not None else ''
+                rows.append(_diff_row(
+                    tag,
+                    str(i + 1) if old is not None else '',
+                    cell1,
+                    str(j + 1) if new is not None else '',
+                    cell2,
+                    css1='diff_sub' if old is not None else '',
+                    css2='diff_add' if new is not None else '',
+                ))
     
-    # Extract table content
-    table_match = re.search(r'<table[^>]*>(.*?)</table>', html_diff, re.DOTALL)
-    table_content = table_match.group(0) if table_match else html_diff
+    # Texts can differ only in line endings while their lines are equal
+    if not rows:
+        rows.append('<tr class="diff_empty"><td colspan="4">No Differences Found</td></tr>')
+    
+    table_rows = '\n'.join(rows)
     
     # Return a complete HTML document with proper structure
     return f"""
@@ -96,7 +338,6 @@ def generate_html_diff(text1: str, text2: str, ignore_leading_whitespace: bool =
     <head>
         <meta charset="UTF-8">
         <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        {styles}
         <style>
             body {{
                 margin: 0;
@@ -104,9 +345,32 @@ def generate_html_diff(text1: str, text2: str, ignore_leading_whitespace: bool =
                 font-family: monospace;
                 background-color: #ffffff;
             }}
-            table {{
+            table.diff {{
                 width: 100%;
                 border-collapse: collapse;
+                table-layout: fixed;
+            }}
+            table.diff th {{
+                background-color: #f0f0f0;
+                padding: 4px;
+            }}
+            table.diff td {{
+                padding: 1px 4px;
+                white-space: pre-wrap;
+                word-break: break-all;
+                tab-size: 4;
+                vertical-align: top;
+            }}
+            .diff_header {{
+                width: 4em;
+                text-align: right;
+                color: #888;
+                background-color: #f0f0f0;
+            }}
+            .diff_sep td, .diff_empty td {{
+                text-align: center;
+                color: #888;
+                background-color: #f0f0f0;
             }}
             .diff_add {{
                 background-color: #d4edda;
@@ -121,13 +385,137 @@ def generate_html_diff(text1: str, text2: str, ignore_leading_whitespace: bool =
     </head>
     <body>
         <div style="width: 100%; overflow-x: auto;">
-            {table_content}
+            <table class="diff">
+                <colgroup><col style="width: 4em"><col><col style="width: 4em"><col></colgroup>
+                <thead><tr><th></th><th>Text 1</th><th></th><th>Text 2</th></tr></thead>
+                <tbody>
+{table_rows}
+                </tbody>
+            </table>
         </div>
     </body>
     </html>
     """
 
 
+@st.cache_data(max_entries=32, ttl=_CACHE_TTL)
+def compute_stats(lines1: List[str], lines2: List[str]) -> Tuple[int, float]:
+    """
+    Compute comparison statistics from a single line-level match.
+    
+    Args:
+        lines1: Lines of the first text, already prepared for comparison
+        lines2: Lines of the second text, already prepared for comparison
+        
+    Returns:
+        Tuple of (number of added/removed lines, similarity percentage)
+    """
+    # Walk the shared opcodes instead of materializing a zero-context unified diff
+    opcodes = compute_opcodes(lines1, lines2)
+    diff_count = sum(
+        (i2 - i1) + (j2 - j1)
+        for tag, i1, i2, j1, j2 in opcodes
+        if tag != 'equal'
+    )
+    
+    # Line-level similarity, equivalent to SequenceMatcher.ratio()
+    matches = sum(i2 - i1 for tag, i1, i2, j1, j2 in opcodes if tag == 'equal')
+    total = len(lines1) + len(lines2)
+    similarity = 2.0 * matches / total * 100 if total else 100.0
+    
+    return diff_count, similarity
+
+
+# Static page markup
+_CSS = """
+<style>
+.main-header {
+    text-align: center;
+    padding: 2rem 0 1rem 0;
+    background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+    -webkit-background-clip: text;
+    -webkit-text-fill-color: transparent;
+    background-clip: text;
+    font-size: 3rem;
+    font-weight: 700;
+    margin-bottom: 0.5rem;
+}
+.sub-header {
+    text-align: center;
+    color: #666;
+    font-size: 1.1rem;
+    margin-bottom: 2rem;
+}
+.stTextArea > div > div > textarea {
+    font-family: 'Monaco', 'Menlo', 'Ubuntu Mono', monospace;
+    font-size: 14px;
+    line-height: 1.6;
+}
+.stTextArea > div > div > button {
+    display: none !important;
+}
+.stTextArea label {
+    display: none !important;
+}
+.stButton > button {
+    width: 100%;
+    background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+    color: white;
+    font-weight: 600;
+    padding: 0.75rem 2rem;
+    border-radius: 8px;
+    border: none;
+    transition: all 0.3s ease;
+}
+.stButton > button:hover {
+    transform: translateY(-2px);
+    box-shadow: 0 4px 12px rgba(102, 126, 234, 0.4);
+}
+.metric-card {
+    background: linear-gradient(135deg, #f5f7fa 0%, #c3cfe2 100%);
+    padding: 1rem;
+    border-radius: 10px;
+    text-align: center;
+}
+.success-box {
+    padding: 1.5rem;
+    border-radius: 10px;
+    background: linear-gradient(135deg, #84fab0 0%, #8fd3f4 100%);
+    border-left: 5px solid #10b981;
+}
+.warning-box {
+    padding: 1.5rem;
+    border-radius: 10px;
+    background: linear-gradient(135deg, #ffeaa7 0%, #fdcb6e 100%);
+    border-left: 5px solid #f59e0b;
+}
+h3 {
+    color: #667eea;
+    font-weight: 600;
+    margin-bottom: 1rem;
+}
+</style>
+"""
+
+_HEADER = '<h1 class="main-header">🔍 Diff Checker</h1>'
+
+_SUB_HEADER = '<p class="sub-header">Compare two texts and visualize the differences between them</p>'
+
+_PRIVACY_NOTICE = """
+**Your data is completely private and secure:**
+
+- ✅ **No logging**: We do not log or track any content you enter
+- ✅ **No data collection**: Your inputs are processed in memory only and never written to disk
+- ✅ **No external requests**: Your data is never sent to third-party services
+- ✅ **No persistence**: Your data is never saved to files or databases
+- ✅ **In-memory processing**: All diff calculations happen in server memory and are discarded within 5 minutes
+
+This application processes your text in memory on the server. Comparison results are cached 
+in server memory for up to 5 minutes so that switching tabs or options does not recompute them, 
+and are then discarded. We have no way to see, access, or store your content.
+"""
+
+
 def main():
     st.set_page_config(
         page_title="Diff Checker",
@@ -137,95 +525,15 @@ def main():
     )
     
     # Custom CSS for better styling
-    st.markdown("""
-    <style>
-    .main-header {
-        text-align: center;
-        padding: 2rem 0 1rem 0;
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-        -webkit-background-clip: text;
-        -webkit-text-fill-color: transparent;
-        background-clip: text;
-        font-size: 3rem;
-        font-weight: 700;
-        margin-bottom: 0.5rem;
-    }
-    .sub-header {
-        text-align: center;
-        color: #666;
-        font-size: 1.1rem;
-        margin-bottom: 2rem;
-    }
-    .stTextArea > div > div > textarea {
-        font-family: 'Monaco', 'Menlo', 'Ubuntu Mono', monospace;
-        font-size: 14px;
-        line-height: 1.6;
-    }
-    .stTextArea > div > div > button {
-        display: none !important;
-    }
-    .stTextArea label {
-        display: none !important;
-    }
-    .stButton > button {
-        width: 100%;
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-        color: white;
-        font-weight: 600;
-        padding: 0.75rem 2rem;
-        border-radius: 8px;
-        border: none;
-        transition: all 0.3s ease;
-    }
-    .stButton > button:hover {
-        transform: translateY(-2px);
-        box-shadow: 0 4px 12px rgba(102, 126, 234, 0.4);
-    }
-    .metric-card {
-        background: linear-gradient(135deg, #f5f7fa 0%, #c3cfe2 100%);
-        padding: 1rem;
-        border-radius: 10px;
-        text-align: center;
-    }
-    .success-box {
-        padding: 1.5rem;
-        border-radius: 10px;
-        background: linear-gradient(135deg, #84fab0 0%, #8fd3f4 100%);
-        border-left: 5px solid #10b981;
-    }
-    .warning-box {
-        padding: 1.5rem;
-        border-radius: 10px;
-        background: linear-gradient(135deg, #ffeaa7 0%, #fdcb6e 100%);
-        border-left: 5px solid #f59e0b;
-    }
-    h3 {
-        color: #667eea;
-        font-weight: 600;
-        margin-bottom: 1rem;
-    }
-    </style>
-    """, unsafe_allow_html=True)
+    st.markdown(_CSS, unsafe_allow_html=True)
     
     # Header
-    st.markdown('<h1 class="main-header">🔍 Diff Checker</h1>', unsafe_allow_html=True)
-    st.markdown('<p class="sub-header">Compare two texts and visualize the differences between them</p>', unsafe_allow_html=True)
+    st.markdown(_HEADER, unsafe_allow_html=True)
+    st.markdown(_SUB_HEADER, unsafe_allow_html=True)
     
     # Privacy notice
     with st.expander("🔒 Privacy & Security", expanded=False):
-        st.markdown("""
-        **Your data is completely private and secure:**
-        
-        - ✅ **No logging**: We do not log, store, or track any content you enter
-        - ✅ **No data collection**: Your inputs are processed in memory only and never stored
-        - ✅ **No external requests**: Your data is never sent to third-party services
-        - ✅ **No persistence**: Your data is never saved to files or databases
-        - ✅ **In-memory processing**: All diff calculations happen in server memory and are discarded after processing
-        
-        This application processes your text in memory on the server. Your data is only kept temporarily 
-        during the comparison and is immediately discarded. We have no way to see, access, or store 
-        your content after the session ends.
-        """)
+        st.markdown(_PRIVACY_NOTICE)
     
     st.markdown("<br>", unsafe_allow_html=True)
     
@@ -281,46 +589,40 @@ def main():
             </div>
             """, unsafe_allow_html=True)
         else:
-            # Prepare texts for comparison
-            text1_compare = text1
-            text2_compare = text2
+            # Split once and share the line lists with every consumer below
+            lines1 = text1.splitlines()
+            lines2 = text2.splitlines()
             
             if ignore_whitespace:
-                # Strip leading whitespace for comparison
-                lines1_stripped = [line.lstrip(' \t') for line in text1.splitlines()]
-                lines2_stripped = [line.lstrip(' \t') for line in text2.splitlines()]
-                text1_compare = '\n'.join(lines1_stripped)
-                text2_compare = '\n'.join(lines2_stripped)
+                lines1_compare = _lines_stripped(text1)
+                lines2_compare = _lines_stripped(text2)
+                identical = lines1_compare == lines2_compare
+            else:
+                lines1_compare = lines1
+                lines2_compare = lines2
+                identical = text1 == text2
             
-            if text1_compare == text2_compare:
+            if identical:
                 st.markdown(f"""
                 <div class="success-box">
                     <h3>✅ Texts are Identical!</h3>
                     <p>{'Leading whitespace differences were ignored.' if ignore_whitespace else 'Both texts match exactly.'}</p>
                 </div>
                 """, unsafe_allow_html=True)
+            elif lines1_compare == lines2_compare:
+                # The diff views work on lines and cannot show line ending changes
+                st.markdown("""
+                <div class="warning-box">
+                    <h4>⚠️ Texts Differ Only in Line Endings</h4>
+                    <p>Every line matches, but the line breaks differ (for example CRLF vs LF, or a missing trailing newline).</p>
+                </div>
+                """, unsafe_allow_html=True)
             else:
                 st.markdown("<br>", unsafe_allow_html=True)
                 
                 # Show statistics first
-                lines1 = text1.splitlines()
-                lines2 = text2.splitlines()
-                
-                if ignore_whitespace:
-                    lines1_compare = [line.lstrip(' \t') for line in lines1]
-                    lines2_compare = [line.lstrip(' \t') for line in lines2]
-                else:
-                    lines1_compare = lines1
-                    lines2_compare = lines2
-                
-                # Count differences
-                diff_lines = list(difflib.unified_diff(
-                    lines1_compare,
-                    lines2_compare,
-                    lineterm='',
-                    n=0
-                ))
-                diff_count = len([line for line in diff_lines if line.startswith(('+', '-')) and not line.startswith(('+++', '---'))])
+                diff_count, similarity = compute_stats(lines1_compare, lines2_compare)
+                coarse = is_coarse_match(lines1_compare, lines2_compare)
                 
                 # Statistics cards
                 st.markdown("### 📊 Comparison Statistics")
@@ -345,13 +647,16 @@ def main():
                         delta=None
                     )
                 with col_stat4:
-                    similarity = difflib.SequenceMatcher(None, text1_compare, text2_compare).ratio() * 100
                     st.metric(
                         label="📈 Similarity",
-                        value=f"{similarity:.1f}%",
-                        delta=None
+                        value=f"{similarity:.1f}% (approx)" if coarse else f"{similarity:.1f}%",
+                        delta=None,
+                        help="Lower bound: the inputs were too large for a full line-by-line match." if coarse else None
                     )
                 
+                if coarse:
+                    st.info("The texts are too large for a full line-by-line match. Everything between their common start and end is shown as a single changed block.")
+                
                 st.markdown("<br>", unsafe_allow_html=True)
                 
                 # Show diff options
@@ -359,7 +664,7 @@ def main():
                 
                 with tab1:
                     st.markdown("### 📋 Unified Diff Output")
-                    diff_output = generate_diff(text1, text2, ignore_leading_whitespace=ignore_whitespace)
+                    diff_output = generate_diff(lines1_compare, lines2_compare)
                     if diff_output:
                         st.code(diff_output, language="diff")
                     else:
@@ -367,7 +672,7 @@ def main():
                 
                 with tab2:
                     st.markdown("### 🎨 Side-by-Side HTML Diff")
-                    html_diff = generate_html_diff(text1, text2, ignore_leading_whitespace=ignore_whitespace)
+                    html_diff = generate_html_diff(lines1_compare, lines2_compare)
                     st.components.v1.html(html_diff, height=600, scrolling=True)
 
 
@@ -0,0 +1,181 @@
+import difflib
+import random
+
+import pytest
+
+pytest.importorskip("streamlit")
+
+import main
+
+
+def test_html_diff_intraline_budget(monkeypatch):
+    # Ten one-line replace blocks of 10x10 characters cost 100 cells each;
+    # a 450 cell budget covers the first four pairs only
+    monkeypatch.setattr(main, '_INTRALINE_BUDGET', 450)
+    lines1 = []
+    lines2 = []
+    for block in range(10):
+        lines1 += [f'abcdefgh{block}0'] + [f'same {block}'] * 7
+        lines2 += [f'abcdefgh{block}1'] + [f'same {block}'] * 7
+
+    rows = main.generate_html_diff(lines1, lines2).split('\n')
+    replace_rows = [row for row in rows if row.startswith('<tr class="diff_replace">')]
+    highlighted = ['<span class="diff_chg">' in row for row in replace_rows]
+
+    assert highlighted == [True] * 4 + [False] * 6
+
+
+def test_html_diff_repeated_character_blocks():
+    # Lines built from a few repeated characters used to take seconds per
+    # pair in the character matcher before autojunk was restored for it
+    lines1 = []
+    lines2 = []
+    for block in range(200):
+        lines1 += ['ab ' * 330] * 4 + [f'same {block}'] * 7
+        lines2 += ['ba ' * 330] * 4 + [f'same {block}'] * 7
+
+    html_diff = main.generate_html_diff(lines1, lines2)
+
+    assert html_diff.count('<tr class="diff_replace">') == 800
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('a\x0c  b', ['a', 'b']),
+    ('a\r  b\x85\tc  d', ['a', 'b', 'c  d']),
+    ('a\r \nb', ['a', '', 'b']),
+    ('a\n  ', ['a', '']),
+    ('  ', ['']),
+])
+def test_lines_stripped_handles_all_line_breaks(text, expected):
+    assert main._lines_stripped(text) == expected
+
+
+def _code_lines(functions):
+    lines = []
+    for k in range(functions):
+        lines += [f'def f{k}(x):', '    if x:', f'        return {k}', '    }', '', '']
+    return lines
+
+
+def test_compute_opcodes_matches_difflib_on_repeated_lines():
+    # Blank lines and braces repeat far more than 1% of the time, so
+    # difflib's autojunk treats them as junk; the line matcher must too
+    lines1 = _code_lines(100)
+    lines2 = lines1[:]
+    del lines2[100:130]
+    lines2[300:300] = [''] * 40
+
+    expected = difflib.SequenceMatcher(None, lines1, lines2).get_opcodes()
+    assert main.compute_opcodes(lines1, lines2) == expected
+
+
+def test_compute_opcodes_large_code_input():
+    lines1 = _code_lines(4000)
+    lines2 = lines1[:]
+    lines2[8000] = 'changed'
+    lines2[16000] = 'also changed'
+
+    assert main.compute_opcodes(lines1, lines2) == [
+        ('equal', 0, 8000, 0, 8000),
+        ('replace', 8000, 8001, 8000, 8001),
+        ('equal', 8001, 16000, 8001, 16000),
+        ('replace', 16000, 16001, 16000, 16001),
+        ('equal', 16001, 24000, 16001, 24000),
+    ]
+
+
+_NUMBERS = [str(k) for k in range(1, 40)]
+
+_EDGE_CASES = [
+    ([], []),
+    ([], ['a', 'b']),
+    (['a', 'b'], []),
+    (['a', 'b', 'c'], ['a', 'x', 'c']),
+    # Trailing equal block longer than the context
+    (['x'] + _NUMBERS, _NUMBERS),
+    # Unchanged gaps longer than 2n between changes
+    (_NUMBERS, _NUMBERS[:8] + ['i'] + _NUMBERS[8:20] + ['20x'] + _NUMBERS[21:23] + _NUMBERS[28:]),
+]
+
+
+@pytest.mark.parametrize('lines1, lines2', _EDGE_CASES)
+def test_group_opcodes_matches_difflib(lines1, lines2):
+    opcodes = difflib.SequenceMatcher(None, lines1, lines2).get_opcodes()
+    expected = list(difflib.SequenceMatcher(None, lines1, lines2).get_grouped_opcodes(3))
+    assert list(main.group_opcodes(opcodes, n=3)) == expected
+
+
+@pytest.mark.parametrize('lines1, lines2', _EDGE_CASES)
+def test_generate_diff_matches_unified_diff(lines1, lines2):
+    expected = '\n'.join(difflib.unified_diff(lines1, lines2, 'Text 1', 'Text 2', lineterm='', n=3))
+    assert main.generate_diff(lines1, lines2) == expected
+
+
+def test_generate_diff_matches_unified_diff_on_random_inputs():
+    rng = random.Random(0)
+    for _ in range(500):
+        lines1 = [rng.choice('abcde') for _ in range(rng.randint(0, 40))]
+        lines2 = [rng.choice('abcdef') for _ in range(rng.randint(0, 40))]
+        expected = '\n'.join(difflib.unified_diff(lines1, lines2, 'Text 1', 'Text 2', lineterm='', n=3))
+        assert main.generate_diff(lines1, lines2) == expected
+
+
+def test_compute_opcodes_falls_back_to_coarse_diff(monkeypatch):
+    monkeypatch.setattr(main, '_LINE_MATCH_BUDGET', 0)
+    lines1 = ['head', 'a', 'b', 'c', 'tail']
+    lines2 = ['head', 'c', 'x', 'tail']
+
+    assert main.is_coarse_match(lines1, lines2)
+    assert main.compute_opcodes(lines1, lines2) == [
+        ('equal', 0, 1, 0, 1),
+        ('replace', 1, 4, 1, 3),
+        ('equal', 4, 5, 3, 4),
+    ]
+
+
+def test_line_match_cost_ignores_popular_lines():
+    # Lines repeating more than 1% of a 200+ line input are autojunk
+    ids2 = [0] * 100 + list(range(1, 101))
+    assert main._line_match_cost([0, 1, 1, 500], ids2) == 2
+
+
+def _table_rows(html_diff):
+    return [row for row in html_diff.split('\n') if row.startswith('<tr class=')]
+
+
+def test_html_diff_escapes_lines():
+    rows = _table_rows(main.generate_html_diff(['if a < b && c:', 'x'], ['if a < b && c:', 'y']))
+
+    assert 'if a &lt; b &amp;&amp; c:' in rows[0]
+    assert '<td class="">if a < b' not in rows[0]
+
+
+def test_html_diff_separates_groups():
+    lines1 = [f'line {k}' for k in range(20)]
+    lines2 = lines1[:]
+    lines2[1] = 'first change'
+    lines2[18] = 'second change'
+
+    rows = _table_rows(main.generate_html_diff(lines1, lines2))
+
+    assert [row.startswith('<tr class="diff_sep">') for row in rows].count(True) == 1
+    assert rows.index('<tr class="diff_sep"><td colspan="4">&#8943;</td></tr>') == 5
+
+
+def test_html_diff_uneven_replace_leaves_missing_side_blank():
+    rows = _table_rows(main.generate_html_diff(['a', 'old 1', 'old 2', 'z'], ['a', 'new', 'z']))
+
+    assert rows[1] == (
+        '<tr class="diff_replace"><td class="diff_header">2</td><td class="diff_sub">old 1</td>'
+        '<td class="diff_header">2</td><td class="diff_add">new</td></tr>'
+    )
+    assert rows[2] == (
+        '<tr class="diff_replace"><td class="diff_header">3</td><td class="diff_sub">old 2</td>'
+        '<td class="diff_header"></td><td class=""></td></tr>'
+    )
+
+
+def test_html_diff_placeholder_when_lines_match():
+    rows = _table_rows(main.generate_html_diff(['a', 'b'], ['a', 'b']))
+
+    assert rows == ['<tr class="diff_empty"><td colspan="4">No Differences Found</td></tr>']